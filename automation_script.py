@@ -11,12 +11,56 @@ import json
 import psutil
 import argparse
 from pathlib import Path
+from urllib.parse import urlparse
 import sys
 import termios
 import tty
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
 from selenium.common.exceptions import TimeoutException
 from tqdm import tqdm  # For progress bars
 
+HUBSPOT_BASE_URL = "https://app.hubspot.com"
+HUBSPOT_PORTAL_ID = "22104039"
+
+# Internal endpoints behind the duplicates UI, read with the browser's session cookies
+DUPLICATES_API_PATH = "/doppelganger/v1/duplicates/companies"
+COMPANY_API_PATH = "/companies/v2/companies/{record_id}"
+
+# Closes the review modal in one round trip: Close button if there is one, else the backdrop
+MODAL_TEARDOWN_SCRIPT = """
+const close = document.querySelector("button[aria-label='Close']");
+if (close) close.click();
+const backdrop = document.querySelector('div.private-modal__backdrop');
+if (backdrop && backdrop.isConnected) backdrop.click();
+return !document.querySelector('div.private-modal');
+"""
+
+# recordId(link), shared by every in-page script: same rule as get_record_ids
+RECORD_ID_SCRIPT = """
+const recordId = link => {
+    const segment = (link.href || '').split('?')[0].replace(/\\/+$/, '').split('/').pop();
+    return /^\\d+$/.test(segment) ? segment : null;
+};
+"""
+
+# First duplicate row whose pair key (see PairQuarantine.pair_key) isn't in arguments[0]
+NEXT_ROW_SCRIPT = RECORD_ID_SCRIPT + """
+const skip = arguments[0];
+for (const row of document.querySelectorAll('tr[data-test-id^="doppel-row-"]')) {
+    const links = Array.from(row.querySelectorAll('td[data-test-id="doppelganger_ui-record-cell"] a[data-test-id="recordLink"]')).slice(0, 2);
+    const ids = links.map(recordId);
+    const key = ids.length === 2 && ids.every(id => id)
+        ? ids.sort().join(':')
+        : links.map(link => link.textContent.trim()).sort().join('|');
+    if (!skip.includes(key)) return row;
+}
+return null;
+"""
+
 def get_single_keypress():
     """Get a single keypress without requiring Enter"""
     fd = sys.stdin.fileno()
@@ -43,6 +87,26 @@ def parse_args():
     # Debug mode (replaces multiple flags)
     parser.add_argument('--debug', action='store_true', help='Enable debug mode with detailed logging and merge verification')
     
+    # Company metadata cache
+    parser.add_argument('--cache-size', type=int, default=5000, help='Maximum number of companies kept in the metadata cache')
+    parser.add_argument('--cache-ttl', type=float, default=900, help='Seconds before cached company metadata is considered stale')
+    
+    # Hybrid mode: bulk HTTP reads with the browser's cookies, browser only for merges
+    parser.add_argument('--hybrid', action='store_true', help='Prefetch duplicate pairs and company details over HTTP using the browser session')
+    parser.add_argument('--http-workers', type=int, default=8, help='Parallel HTTP requests in hybrid mode')
+    parser.add_argument('--api-base', default=HUBSPOT_BASE_URL, help='Base URL for hybrid-mode HTTP reads (e.g. a local stub)')
+    
+    # Adaptive concurrency
+    parser.add_argument('--max-inflight', type=int, default=4, help='Ceiling for the adaptive concurrency limit (pairs in flight)')
+    
+    # Poison-pair quarantine
+    parser.add_argument('--quarantine-after', type=int, default=2, help='Failures before a pair is quarantined')
+    parser.add_argument('--quarantine-action', choices=['skip', 'reject'], default='skip', help='What to do with quarantined pairs')
+    
+    # Automation backend
+    parser.add_argument('--backend', choices=['selenium', 'cdp'], default='selenium', help='Drive the page through Selenium or directly over the DevTools protocol (needs websockets)')
+    parser.add_argument('--tabs', type=int, default=1, help='Concurrent tabs with the CDP backend')
+    
     # Browser options
     parser.add_argument('--keep-open', action='store_true', help='Keep browser open after completion')
     
@@ -290,8 +354,361 @@ def get_domain_rank(domain):
             return ranks[ext]
     return None  # Return None for unranked domains
 
+class CompanyCache:
+    """Bounded LRU/TTL cache of company metadata keyed by HubSpot record ID"""
+
+    def __init__(self, max_size=5000, ttl=900):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # record_id -> {'contacts', 'domain', 'last_seen'}
+        self.hits = 0  # Pairs decided from the cache (modal scrape skipped)
+        self.misses = 0  # Pairs that still needed the modal scraped
+
+    def get(self, record_id):
+        """Return a fresh entry for record_id, or None"""
+        entry = self.entries.get(record_id) if record_id else None
+        if entry is None or time.time() - entry['last_seen'] > self.ttl:
+            if entry is not None:
+                del self.entries[record_id]  # Expired
+            return None
+        self.entries.move_to_end(record_id)
+        return entry
+
+    def get_pair(self, left_id, right_id):
+        """Return both entries if both are fresh, else (None, None); counts one hit/miss per pair"""
+        left, right = self.get(left_id), self.get(right_id)
+        if left and right:
+            self.hits += 1
+            return left, right
+        self.misses += 1
+        return None, None
+
+    def is_fresh(self, record_id):
+        """Check for a fresh entry without touching hit/miss stats or LRU order"""
+        entry = self.entries.get(record_id)
+        return entry is not None and time.time() - entry['last_seen'] <= self.ttl
+
+    def put(self, record_id, contacts, domain):
+        """Store or refresh metadata for a company"""
+        if not record_id:
+            return
+        self.entries[record_id] = {
+            'contacts': contacts,
+            'domain': domain,
+            'last_seen': time.time()
+        }
+        self.entries.move_to_end(record_id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)  # Evict least recently used
+
+    def record_merge(self, survivor_id, absorbed_id):
+        """Drop both records after a merge"""
+        self.entries.pop(absorbed_id, None)
+        # HubSpot de-duplicates shared contacts on merge, so the survivor's new count is unknown
+        self.entries.pop(survivor_id, None)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return (self.hits / lookups) if lookups else 0.0
+
+class ConcurrencyController:
+    """AIMD limit on in-flight pairs (or pacing, for Selenium), halved when HubSpot pushes back"""
+
+    def __init__(self, ceiling=4, initial=None, minimum=1, decrease_factor=0.5, slow_factor=2.0, pacing_step=0.5):
+        self.ceiling = max(ceiling, minimum)
+        self.minimum = minimum
+        # Start at full speed; only backpressure brings the limit (and pauses) in
+        initial = self.ceiling if initial is None else initial
+        self.limit = float(min(max(initial, minimum), self.ceiling))
+        self.decrease_factor = decrease_factor
+        self.slow_factor = slow_factor  # Latency above slow_factor x baseline counts as backpressure
+        self.pacing_step = pacing_step
+        self.latency_baseline = None
+        self.window = 0  # Successes since the last change
+        self.cooldown = 0  # Pairs to see before another decrease is allowed
+        self.successes = 0
+        self.backpressure = {}  # reason -> count
+        self.peak_limit = self.limit
+        self.lowest_limit = self.limit
+
+    def in_flight_limit(self):
+        return int(self.limit)
+
+    def pacing_delay(self):
+        """Seconds to pause between pairs when only one pair can be in flight"""
+        return self.pacing_step * (self.ceiling / self.limit - 1)
+
+    def record_success(self, latency):
+        """A pair finished normally in `latency` seconds"""
+        slow = self.latency_baseline and latency > self.slow_factor * self.latency_baseline
+        # Every sample feeds the baseline so it follows a lasting change in latency
+        self.latency_baseline = latency if self.latency_baseline is None else 0.8 * self.latency_baseline + 0.2 * latency
+        if slow:
+            self.record_backpressure('slow')
+            return
+
+        self.successes += 1
+        if self.cooldown:
+            self.cooldown -= 1
+        self.window += 1
+        if self.window >= self.in_flight_limit() and self.limit < self.ceiling:
+            self.limit = min(float(self.ceiling), self.limit + 1)
+            self.peak_limit = max(self.peak_limit, self.limit)
+            self.window = 0
+
+    def record_backpressure(self, reason):
+        """HubSpot pushed back ('timeout', 'error_modal', 'recovery' or 'slow')"""
+        self.backpressure[reason] = self.backpressure.get(reason, 0) + 1
+        self.window = 0
+        if self.cooldown:
+            self.cooldown -= 1  # Already backed off for this window
+            return
+        self.cooldown = self.in_flight_limit()
+        self.limit = max(self.minimum, self.limit * self.decrease_factor)
+        self.lowest_limit = min(self.lowest_limit, self.limit)
+
+class PairQuarantine:
+    """Persistent record of pairs that keep failing, retried after an exponentially growing delay"""
+
+    def __init__(self, path, threshold=2, base_delay=3600, max_delay=7 * 86400):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.entries = {}  # pair key -> failure signature
+        self.skipped_keys = set()  # Pairs skipped this run, left in place across batches
+        self.skipped = 0
+        self.time_saved = 0.0
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text())
+            except Exception as e:
+                print(f"Error reading quarantine file: {e}")
+
+    @staticmethod
+    def pair_key(left_id, right_id, company1, company2):
+        """Order-independent key: record IDs when known, company names otherwise"""
+        if left_id and right_id:
+            return ':'.join(sorted([left_id, right_id]))
+        return '|'.join(sorted([company1, company2]))
+
+    def save(self):
+        temp_path = self.path.with_suffix('.tmp')
+        temp_path.write_text(json.dumps(self.entries, indent=2))
+        temp_path.replace(self.path)
+
+    def should_skip(self, key):
+        entry = self.entries.get(key)
+        if not entry or entry['count'] < self.threshold:
+            return False
+        return time.time() < entry['next_eligible']
+
+    def record_skip(self, key):
+        """Count a skip (once per run) and the time its failures would have cost again"""
+        if key in self.skipped_keys:
+            return
+        self.skipped_keys.add(key)
+        entry = self.entries[key]
+        self.skipped += 1
+        self.time_saved += entry['failure_seconds'] / entry['count']
+
+    def record_failure(self, key, error_class, seconds, record_ids=None, companies=None):
+        now = time.time()
+        entry = self.entries.setdefault(key, {
+            'record_ids': list(record_ids or []),
+            'companies': list(companies or []),
+            'count': 0,
+            'errors': {},
+            'failure_seconds': 0.0,
+            'next_eligible': 0
+        })
+        entry['count'] += 1
+        entry['errors'][error_class] = entry['errors'].get(error_class, 0) + 1
+        entry['last_error'] = error_class
+        entry['last_failure'] = now
+        entry['failure_seconds'] += seconds
+        if entry['count'] >= self.threshold:
+            delay = min(self.max_delay, self.base_delay * 2 ** (entry['count'] - self.threshold))
+            entry['next_eligible'] = now + delay
+        self.save()
+
+    def record_success(self, key):
+        if self.entries.pop(key, None) is not None:
+            self.save()
+
+    def quarantined_count(self):
+        return sum(1 for entry in self.entries.values() if entry['count'] >= self.threshold)
+
+def choose_primary(left_contacts, right_contacts, left_domain, right_domain, debug_mode=False):
+    """Decide whether the right company should be primary (True) or the left one (False)"""
+    # First check contact counts
+    if left_contacts > right_contacts:
+        if debug_mode:
+            print(f"Left company has more contacts ({left_contacts} > {right_contacts})")
+        return False
+    if right_contacts > left_contacts:
+        if debug_mode:
+            print(f"Right company has more contacts ({right_contacts} > {left_contacts})")
+        return True
+
+    # If contact counts are tied or both '--', check domains
+    if debug_mode:
+        print("Contact counts are equal or both '--', checking domains...")
+    if left_domain == right_domain or (left_domain == '--' and right_domain == '--'):
+        if debug_mode:
+            print("Domains are same or both '--', selecting left company")
+        return False
+
+    # Compare domain ranks
+    left_rank = get_domain_rank(left_domain)
+    right_rank = get_domain_rank(right_domain)
+    if left_rank is not None and right_rank is not None:
+        if left_rank < right_rank:  # Lower rank is better
+            if debug_mode:
+                print(f"Left domain has better rank ({left_rank} < {right_rank})")
+            return False
+        if debug_mode:
+            print(f"Right domain has better or equal rank ({right_rank} <= {left_rank})")
+        return True
+
+    if debug_mode:
+        print("One or both domains unranked, selecting left company")
+    return False
+
+def get_record_ids(current_row):
+    """Get HubSpot record IDs for both companies in a duplicate row"""
+    try:
+        links = current_row.find_elements(By.CSS_SELECTOR, 'td[data-test-id="doppelganger_ui-record-cell"] a[data-test-id="recordLink"]')
+        ids = []
+        for link in links[:2]:
+            href = (link.get_attribute('href') or '').split('?')[0].rstrip('/')
+            record_id = href.rsplit('/', 1)[-1]
+            ids.append(record_id if record_id.isdigit() else None)
+        if len(ids) == 2:
+            return ids[0], ids[1]
+    except Exception:
+        pass
+    return None, None
+
+class HubSpotSession:
+    """Pooled HTTP session that reuses the browser's authenticated cookies for bulk reads"""
+
+    def __init__(self, driver, base_url=HUBSPOT_BASE_URL, portal_id=HUBSPOT_PORTAL_ID, max_workers=8, debug_mode=False):
+        self.driver = driver
+        self.base_url = base_url.rstrip('/')
+        self.host = urlparse(self.base_url).hostname
+        self.portal_id = portal_id
+        self.max_workers = max_workers
+        self.debug_mode = debug_mode
+        self.cookie_expiry = None  # Earliest expiry among copied cookies
+        self.cookie_lock = threading.Lock()  # Selenium drivers aren't thread-safe
+        self.cookie_generation = 0  # Bumped on every refresh so concurrent 401s refresh once
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.refresh_cookies()
+
+    def refresh_cookies(self, seen_generation=None):
+        """Copy the current cookies from the Selenium driver, unless another thread already has since seen_generation"""
+        with self.cookie_lock:
+            if seen_generation is not None and seen_generation != self.cookie_generation:
+                return
+            cookies = self.driver.get_cookies()
+            expiries = []
+            for cookie in cookies:
+                # Scoped to the API host so the session cookies are never sent anywhere else
+                self.session.cookies.set(
+                    cookie['name'], cookie['value'],
+                    domain=self.host, path=cookie.get('path', '/'), secure=cookie.get('secure', False)
+                )
+                if cookie.get('expiry'):
+                    expiries.append(cookie['expiry'])
+                if cookie['name'] == 'hubspotapi-csrf':
+                    self.session.headers['X-HubSpot-CSRF-hubspotapi'] = cookie['value']
+            # Overwritten in place and pruned one by one; clearing the jar would strip requests in flight
+            names = {cookie['name'] for cookie in cookies}
+            for stale in [cookie for cookie in self.session.cookies if cookie.name not in names]:
+                self.session.cookies.clear(stale.domain, stale.path, stale.name)
+            self.cookie_expiry = min(expiries) if expiries else None
+            self.cookie_generation += 1
+        if self.debug_mode:
+            print(f"  🍪 Copied {len(cookies)} cookies from browser session")
+
+    def get_json(self, path, params=None):
+        """GET a JSON endpoint, refreshing cookies once if they expired or were rejected"""
+        generation = self.cookie_generation
+        if self.cookie_expiry and time.time() >= self.cookie_expiry:
+            self.refresh_cookies(generation)
+            generation = self.cookie_generation
+
+        params = dict(params or {}, portalId=self.portal_id)
+        url = f"{self.base_url}{path}"
+        # Redirects aren't followed: HubSpot redirects expired sessions to its login page
+        response = self.session.get(url, params=params, timeout=15, allow_redirects=False)
+        if response.status_code in (401, 403) or response.is_redirect:
+            self.refresh_cookies(generation)
+            response = self.session.get(url, params=params, timeout=15, allow_redirects=False)
+        if response.is_redirect:
+            raise requests.HTTPError(f"Unexpected redirect to {response.headers.get('Location')}", response=response)
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_duplicate_pairs(self, limit=None):
+        """Get (left_id, right_id) record ID pairs from the duplicates list"""
+        pairs = []
+        offset = 0
+        while True:
+            data = self.get_json(DUPLICATES_API_PATH, {'offset': offset, 'count': 100})
+            for result in data.get('results', []):
+                ids = [str(record_id) for record_id in result.get('objectIds', [])]
+                if len(ids) == 2:
+                    pairs.append((ids[0], ids[1]))
+            if limit and len(pairs) >= limit:
+                return pairs[:limit]
+            if not data.get('hasMore'):
+                return pairs
+            offset = data.get('offset', offset + 100)
+
+    def fetch_company(self, record_id):
+        """Get (contact count, domain) for a single company"""
+        data = self.get_json(COMPANY_API_PATH.format(record_id=record_id))
+        properties = data.get('properties', {})
+
+        def value(name):
+            prop = properties.get(name)
+            return prop.get('value') if isinstance(prop, dict) else prop
+
+        contacts = value('num_associated_contacts')
+        contacts = int(contacts) if contacts not in (None, '', '--') else 0
+        return contacts, value('domain') or '--'
+
+    def fetch_companies(self, record_ids):
+        """Fetch several companies in parallel, skipping any that fail"""
+        companies = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.fetch_company, record_id): record_id for record_id in record_ids}
+            for future in as_completed(futures):
+                try:
+                    companies[futures[future]] = future.result()
+                except Exception as e:
+                    if self.debug_mode:
+                        print(f"  ⚠️ Failed to fetch company {futures[future]}: {str(e)}")
+        return companies
+
+    def prefetch_into_cache(self, company_cache, limit=None):
+        """Bulk-load metadata for the visible duplicate pairs into the company cache"""
+        pairs = self.fetch_duplicate_pairs(limit)
+        record_ids = {record_id for pair in pairs for record_id in pair}
+        stale_ids = [record_id for record_id in record_ids if not company_cache.is_fresh(record_id)]
+        companies = self.fetch_companies(stale_ids)
+        for record_id, (contacts, domain) in companies.items():
+            company_cache.put(record_id, contacts, domain)
+        return len(companies)
+
 def get_contact_counts(driver, current_row=None, debug_mode=False):
-    """Get contact counts from both companies in merge modal"""
+    """Get contact counts from both companies in merge modal; (None, None) if the error modal was handled"""
     try:
         print("\n📊 Getting contact counts...")
         
@@ -315,38 +732,38 @@ def get_contact_counts(driver, current_row=None, debug_mode=False):
                 )
                 
                 if len(contact_elements) != 2:
-                    return None, None, "Wrong number of elements found"
+                    return None, None, ValueError("Wrong number of elements found")
                 
                 left_text = contact_elements[0].text.strip()
                 right_text = contact_elements[1].text.strip()
                 
                 # Handle empty strings
                 if left_text == '' or right_text == '':
-                    return None, None, "Empty values found"
+                    return None, None, ValueError("Empty values found")
                 
                 if not is_valid_text(left_text) or not is_valid_text(right_text):
-                    return None, None, "Invalid values found"
+                    return None, None, ValueError("Invalid values found")
                 
                 # Convert to numbers
                 left_contacts = 0 if left_text == '--' else int(left_text)
                 right_contacts = 0 if right_text == '--' else int(right_text)
                 
-                return left_contacts, right_contacts, "Success"
+                return left_contacts, right_contacts, None
                 
             except Exception as e:
-                return None, None, str(e)
+                return None, None, e
         
         # Main retry loop
         max_attempts = 5  # Keep 5 retries for contact counts
         for attempt in range(max_attempts):
             print(f"  Attempt {attempt + 1}/{max_attempts}...")
-            left, right, message = get_counts()
+            left, right, error = get_counts()
             
             if left is not None and right is not None:
                 print(f"  ✅ Found valid counts: Left({left}) Right({right})")
                 return left, right
             
-            print(f"  ⚠️ {message}, retrying...")
+            print(f"  ⚠️ {error}, retrying...")
             if attempt < max_attempts - 1:
                 time.sleep(0.5)  # Short delay between retries
             elif current_row and debug_mode:  # On last attempt failure, check for error modal
@@ -354,11 +771,12 @@ def get_contact_counts(driver, current_row=None, debug_mode=False):
                 if check_for_error_modal(driver, current_row, debug_mode):
                     return None, None
         
-        raise Exception(f"Failed to get valid contact counts after {max_attempts} attempts")
+        # Raise the last attempt's own error so the quarantine records the real cause
+        raise error
         
     except Exception as e:
         print(f"  ❌ Error getting contact counts: {str(e)}")
-        return None, None
+        raise
 
 def get_current_selection(driver):
     """Get which company (left/right) is currently selected"""
@@ -457,6 +875,17 @@ def get_company_domains(driver):
         print(f"Error getting company domains: {str(e)}")
         return None, None
 
+def error_modal_shown(driver):
+    """Wait for the review modal or the validation error modal; True if it's the error"""
+    try:
+        WebDriverWait(driver, 2).until(EC.any_of(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "div.private-selectable-box.private-selectable-button")),
+            EC.presence_of_element_located((By.CSS_SELECTOR, "h4.private-error-msg__title"))
+        ))
+    except TimeoutException:
+        return False
+    return bool(driver.find_elements(By.CSS_SELECTOR, "h4.private-error-msg__title"))
+
 def check_for_error_modal(driver, current_row, debug_mode=False):
     """Check if error modal appears and handle it"""
     try:
@@ -504,22 +933,39 @@ def check_for_error_modal(driver, current_row, debug_mode=False):
             print(f"Error handling validation modal: {str(e)}")
         return False
 
-def process_duplicates(driver, pairs_to_process, progress_bar=None, args=None):
+def process_duplicates(driver, pairs_to_process, progress_bar=None, args=None, company_cache=None, controller=None, quarantine=None):
     try:
         merged_companies = set()
         processed_count = 0
         debug_mode = args and args.debug
+        quarantine_action = getattr(args, 'quarantine_action', 'skip') if args else 'skip'
         
         while processed_count < pairs_to_process:
+            pair_key = None
             try:
+                # Back off between pairs while HubSpot is pushing back
+                if controller:
+                    if processed_count:
+                        time.sleep(controller.pacing_delay())
+                    if progress_bar:
+                        progress_bar.set_postfix(limit=f"{controller.limit:.1f}")
+                pair_start = time.time()
+                
                 if debug_mode:
                     print(f"\nProcessing pair {processed_count + 1} of {pairs_to_process}...")
                 
                 # Try to find next row with a short timeout
                 try:
-                    current_row = WebDriverWait(driver, 3).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, 'tr[data-test-id^="doppel-row-"]'))
-                    )
+                    if quarantine and quarantine.skipped_keys:
+                        # Quarantined pairs stay in the list, so step over them for the whole run
+                        skipped_keys = list(quarantine.skipped_keys)
+                        current_row = WebDriverWait(driver, 3).until(
+                            lambda d: d.execute_script(NEXT_ROW_SCRIPT, skipped_keys)
+                        )
+                    else:
+                        current_row = WebDriverWait(driver, 3).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, 'tr[data-test-id^="doppel-row-"]'))
+                        )
                 except TimeoutException:
                     if debug_mode:
                         print("\n✅ No more rows to process!")
@@ -548,30 +994,69 @@ def process_duplicates(driver, pairs_to_process, progress_bar=None, args=None):
                         progress_bar.update(1)
                     continue
                 
-                # Step 2: Click Review to open modal
-                if debug_mode:
-                    print("\nOpening review modal...")
-                review_button = current_row.find_element(By.XPATH, ".//button[.//i18n-string[@data-key='duplicates.openReviewModal']]")
-                driver.execute_script("arguments[0].click();", review_button)
-                
-                # Step 3: Extract and compare information
-                if debug_mode:
-                    print("\nExtracting company information...")
-                
-                # Get contact counts with retries (will also check for error modal)
-                contact_counts = get_contact_counts(driver, current_row, debug_mode)
-                if not contact_counts:
+                # Step 2: Skip (or reject) pairs that keep failing before any modal opens
+                left_id, right_id = get_record_ids(current_row)
+                pair_key = PairQuarantine.pair_key(left_id, right_id, company1, company2)
+                if quarantine and quarantine.should_skip(pair_key):
                     if debug_mode:
-                        print("❌ Failed to get contact counts")
+                        print(f"⚠️ Pair is quarantined after repeated failures ({quarantine_action})")
+                    quarantine.record_skip(pair_key)
+                    if quarantine_action == 'reject':
+                        reject_button = current_row.find_element(By.XPATH, ".//button[.//i18n-string[@data-key='duplicates.table.buttons.reject']]")
+                        driver.execute_script("arguments[0].click();", reject_button)
+                        WebDriverWait(driver, 3).until(
+                            EC.staleness_of(reject_button)
+                        )
                     processed_count += 1
                     if progress_bar:
                         progress_bar.update(1)
                     continue
                 
-                left_contacts, right_contacts = contact_counts
+                # Step 3: Check the metadata cache so the decision can be made before the modal opens
+                left_cached, right_cached = company_cache.get_pair(left_id, right_id) if company_cache else (None, None)
                 
-                # Get domains (quick check, don't wait if not immediately available)
-                left_domain, right_domain = get_company_domains(driver)
+                # Step 4: Click Review to open modal
+                if debug_mode:
+                    print("\nOpening review modal...")
+                review_button = current_row.find_element(By.XPATH, ".//button[.//i18n-string[@data-key='duplicates.openReviewModal']]")
+                driver.execute_script("arguments[0].click();", review_button)
+                
+                scraped = False
+                if left_cached and right_cached:
+                    if debug_mode:
+                        print("\nUsing cached company information...")
+                        # Scraping is skipped, so check for the validation error modal here instead
+                        if error_modal_shown(driver) and check_for_error_modal(driver, current_row, debug_mode):
+                            if controller:
+                                controller.record_backpressure('error_modal')
+                            processed_count += 1
+                            if progress_bar:
+                                progress_bar.update(1)
+                            continue
+                    left_contacts, right_contacts = left_cached['contacts'], right_cached['contacts']
+                    left_domain, right_domain = left_cached['domain'], right_cached['domain']
+                else:
+                    # Step 4b: Extract company information from the modal
+                    if debug_mode:
+                        print("\nExtracting company information...")
+                    
+                    # Get contact counts with retries (will also check for error modal). Failures raise
+                    # into the recovery path below; (None, None) means the pair was rejected instead
+                    contact_counts = get_contact_counts(driver, current_row, debug_mode)
+                    if contact_counts[0] is None:
+                        if controller:
+                            controller.record_backpressure('error_modal')
+                        processed_count += 1
+                        if progress_bar:
+                            progress_bar.update(1)
+                        continue
+                    
+                    left_contacts, right_contacts = contact_counts
+                    
+                    # Get domains (quick check, don't wait if not immediately available)
+                    left_domain, right_domain = get_company_domains(driver)
+                    
+                    scraped = True
                 
                 if debug_mode:
                     print(f"\nContact Counts:")
@@ -583,47 +1068,16 @@ def process_duplicates(driver, pairs_to_process, progress_bar=None, args=None):
                         print(f"Left company: {left_domain}")
                         print(f"Right company: {right_domain}")
                 
-                # Step 4: Make selection decision
+                # Step 5: Make selection decision
                 if debug_mode:
                     print("\nMaking selection decision...")
-                select_right = False
+                select_right = choose_primary(left_contacts, right_contacts, left_domain, right_domain, debug_mode)
                 
-                # First check contact counts
-                if left_contacts > right_contacts:
-                    if debug_mode:
-                        print(f"Left company has more contacts ({left_contacts} > {right_contacts})")
-                    select_right = False
-                elif right_contacts > left_contacts:
-                    if debug_mode:
-                        print(f"Right company has more contacts ({right_contacts} > {left_contacts})")
-                    select_right = True
-                else:
-                    # If contact counts are tied or both '--', check domains
-                    if debug_mode:
-                        print("Contact counts are equal or both '--', checking domains...")
-                    if left_domain == right_domain or (left_domain == '--' and right_domain == '--'):
-                        if debug_mode:
-                            print("Domains are same or both '--', selecting left company")
-                        select_right = False
-                    else:
-                        # Compare domain ranks
-                        left_rank = get_domain_rank(left_domain)
-                        right_rank = get_domain_rank(right_domain)
-                        if left_rank is not None and right_rank is not None:
-                            if left_rank < right_rank:  # Lower rank is better
-                                if debug_mode:
-                                    print(f"Left domain has better rank ({left_rank} < {right_rank})")
-                                select_right = False
-                            else:
-                                if debug_mode:
-                                    print(f"Right domain has better or equal rank ({right_rank} <= {left_rank})")
-                                select_right = True
-                        else:
-                            if debug_mode:
-                                print("One or both domains unranked, selecting left company")
-                            select_right = False
-                
-                # Step 5: Select company and confirm
+                if company_cache and scraped:
+                    company_cache.put(left_id, left_contacts, left_domain)
+                    company_cache.put(right_id, right_contacts, right_domain)
+                
+                # Step 6: Select company and confirm
                 current = get_current_selection(driver)
                 desired = 'right' if select_right else 'left'
                 
@@ -634,7 +1088,7 @@ def process_duplicates(driver, pairs_to_process, progress_bar=None, args=None):
                 elif debug_mode:
                     print(f"\nKeeping current selection ({current} company)")
                 
-                # Step 6: Ask for confirmation in debug mode
+                # Step 7: Ask for confirmation in debug mode
                 if debug_mode:
                     print("\nCurrent Selection Summary:")
                     print("-" * 50)
@@ -656,7 +1110,7 @@ def process_duplicates(driver, pairs_to_process, progress_bar=None, args=None):
                             progress_bar.close()
                         return False  # This will trigger asking for new batch size
                 
-                # Step 7: Execute merge
+                # Step 8: Execute merge
                 if debug_mode:
                     print("\nExecuting merge...")
                 merge_button = WebDriverWait(driver, 3).until(
@@ -669,6 +1123,18 @@ def process_duplicates(driver, pairs_to_process, progress_bar=None, args=None):
                     EC.staleness_of(merge_button)
                 )
                 
+                # Survivor absorbed the other record, so its cached metadata changed
+                if company_cache:
+                    if select_right:
+                        company_cache.record_merge(right_id, left_id)
+                    else:
+                        company_cache.record_merge(left_id, right_id)
+                
+                if controller:
+                    controller.record_success(time.time() - pair_start)
+                if quarantine:
+                    quarantine.record_success(pair_key)
+                
                 # Add to processed set and increment counter
                 merged_companies.add(company_pair)
                 processed_count += 1
@@ -681,25 +1147,26 @@ def process_duplicates(driver, pairs_to_process, progress_bar=None, args=None):
             except Exception as e:
                 if debug_mode:
                     print(f"❌ Error processing pair: {str(e)}")
+                if controller:
+                    controller.record_backpressure('timeout' if isinstance(e, TimeoutException) else 'recovery')
                 try:
-                    # Try to find the close button by its aria-label
-                    close_button = WebDriverWait(driver, 2).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "button[aria-label='Close']"))
-                    )
-                    driver.execute_script("arguments[0].click();", close_button)
-                    
-                    # Wait for modal to close
-                    WebDriverWait(driver, 3).until(
-                        EC.invisibility_of_element_located((By.CSS_SELECTOR, "div.private-modal"))
-                    )
+                    # Tear the modal down in one script instead of waiting on the Close button,
+                    # then give a closing animation a moment so the next pair doesn't find it
+                    if not driver.execute_script(MODAL_TEARDOWN_SCRIPT):
+                        WebDriverWait(driver, 1).until(
+                            EC.invisibility_of_element_located((By.CSS_SELECTOR, 'div.private-modal'))
+                        )
+                except TimeoutException:
+                    if debug_mode:
+                        print("⚠️ Review modal still open after teardown")
                 except:
-                    # If can't find close button, try clicking outside the modal to close it
-                    try:
-                        driver.execute_script("""
-                            document.querySelector('div.private-modal__backdrop').click();
-                        """)
-                    except:
-                        pass  # Modal might already be closed
+                    pass  # Modal might already be closed
+                
+                if quarantine and pair_key:
+                    quarantine.record_failure(
+                        pair_key, type(e).__name__, time.time() - pair_start,
+                        record_ids=[left_id, right_id], companies=[company1, company2]
+                    )
                 
                 if progress_bar:
                     progress_bar.update(1)
@@ -713,6 +1180,19 @@ def process_duplicates(driver, pairs_to_process, progress_bar=None, args=None):
             print(f"❌ An error occurred: {str(e)}")
         return False
 
+def print_run_summary(company_cache, controller, quarantine):
+    """Print end-of-run statistics"""
+    print("\nRun Summary:")
+    print("-" * 50)
+    pairs = company_cache.hits + company_cache.misses
+    print(f"Cache hit rate: {company_cache.hit_rate():.1%} ({company_cache.hits}/{pairs} pairs decided without scraping the modal)")
+    print(f"Cached companies: {len(company_cache.entries)}")
+    print(f"Concurrency limit: {controller.limit:.1f} (range {controller.lowest_limit:.1f}-{controller.peak_limit:.1f}, ceiling {controller.ceiling})")
+    backpressure = ', '.join(f"{reason}: {count}" for reason, count in sorted(controller.backpressure.items())) or 'none'
+    print(f"Backpressure events: {backpressure}")
+    print(f"Quarantine: {quarantine.skipped} pairs skipped, ~{quarantine.time_saved:.1f}s saved ({quarantine.quarantined_count()} pairs quarantined)")
+    print("-" * 50)
+
 def automate_merge():
     # Parse command line arguments
     args = parse_args()
@@ -728,10 +1208,19 @@ def automate_merge():
     if not driver:
         return
     
+    # Company metadata survives across batches so repeated companies skip re-scraping
+    company_cache = CompanyCache(max_size=args.cache_size, ttl=args.cache_ttl)
+    
+    # Likewise the concurrency limit carries over, so each batch starts where the last settled
+    controller = ConcurrencyController(ceiling=args.max_inflight)
+    
+    # Pairs that keep failing are remembered across runs
+    quarantine = PairQuarantine(get_config_dir() / 'quarantine.json', threshold=args.quarantine_after)
+    
     try:
         if debug_mode:
             print("\nOpening HubSpot duplicates page...")
-        driver.get("https://app.hubspot.com/duplicates/22104039/companies")
+        driver.get(f"{HUBSPOT_BASE_URL}/duplicates/{HUBSPOT_PORTAL_ID}/companies")
         
         if debug_mode:
             print("\nWaiting for you to log in manually and navigate to the duplicates page...")
@@ -742,6 +1231,17 @@ def automate_merge():
             lambda x: "duplicates" in x.current_url and "login" not in x.current_url
         )
         
+        # Both backends share the same signature and return values
+        process_pairs = process_duplicates
+        if args.backend == 'cdp':
+            from cdp_backend import process_duplicates_cdp
+            process_pairs = process_duplicates_cdp
+        
+        # In hybrid mode, reads go over HTTP with the browser's cookies
+        http_session = None
+        if args.hybrid:
+            http_session = HubSpotSession(driver, base_url=args.api_base, max_workers=args.http_workers, debug_mode=debug_mode)
+        
         # Main processing loop
         while True:
             if debug_mode:
@@ -752,13 +1252,25 @@ def automate_merge():
             if pairs_to_process is None:  # User cancelled
                 break
             
+            if http_session:
+                try:
+                    fetched = http_session.prefetch_into_cache(company_cache, limit=pairs_to_process)
+                    if debug_mode:
+                        print(f"\n🌐 Prefetched {fetched} companies over HTTP")
+                except Exception as e:
+                    # Fall back to reading each modal in the browser
+                    print(f"\n⚠️ HTTP prefetch failed, using browser reads: {str(e)}")
+            
             # Process in batches with progress bar
             with tqdm(total=pairs_to_process, disable=not debug_mode) as pbar:
-                success = process_duplicates(
+                success = process_pairs(
                     driver=driver,
                     pairs_to_process=pairs_to_process,
                     progress_bar=pbar,
-                    args=args
+                    args=args,
+                    company_cache=company_cache,
+                    controller=controller,
+                    quarantine=quarantine
                 )
             
             if success is None:  # No more rows to process
@@ -783,6 +1295,8 @@ def automate_merge():
         else:
             print(f"\n❌ An error occurred: {str(e)}")
     finally:
+        print_run_summary(company_cache, controller, quarantine)
+        
         if args.keep_open:
             if debug_mode:
                 print("\nBrowser will remain open. You can close it manually when done.")
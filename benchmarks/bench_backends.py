@@ -0,0 +1,96 @@
+"""Head-to-head benchmark of the Selenium and CDP backends on the local fixture page.
+
+Serves duplicates_fixture.html over HTTP, starts a throwaway headless Chrome
+(no profile, no HubSpot login) and times each backend over the same number of
+pairs:
+
+    python benchmarks/bench_backends.py --pairs 50 --tabs 1 4
+"""
+import argparse
+import asyncio
+import functools
+import http.server
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from automation_script import process_duplicates  # noqa: E402
+from cdp_backend import get_debugger_ws_url, run_pairs  # noqa: E402
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark Selenium vs CDP backends on the fixture page')
+    parser.add_argument('--pairs', type=int, default=50, help='Pairs per run')
+    parser.add_argument('--tabs', type=int, nargs='+', default=[1, 4], help='Tab counts to try with the CDP backend')
+    parser.add_argument('--delay', type=int, default=150, help='Fixture modal load delay (ms)')
+    parser.add_argument('--merge-delay', type=int, default=200, help='Fixture merge/reject delay (ms)')
+    return parser.parse_args()
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+def serve_fixture():
+    """Serve this directory on a free local port"""
+    handler = functools.partial(QuietHandler, directory=str(Path(__file__).parent))
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def start_chrome():
+    options = Options()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+
+def fixture_url(server, args):
+    # A fresh run key so each benchmark starts with every pair unprocessed
+    return (f"http://127.0.0.1:{server.server_port}/duplicates_fixture.html"
+            f"?pairs={args.pairs}&delay={args.delay}&mergeDelay={args.merge_delay}&run={uuid.uuid4().hex}")
+
+def bench_selenium(driver, url, pairs):
+    driver.get(url)
+    start = time.time()
+    process_duplicates(driver, pairs, args=SimpleNamespace(debug=False))
+    return time.time() - start, None
+
+def bench_cdp(driver, url, pairs, tabs):
+    start = time.time()
+    run = asyncio.run(run_pairs(get_debugger_ws_url(driver), url, pairs, tabs=tabs))
+    return time.time() - start, run.commands_sent
+
+def main():
+    args = parse_args()
+    server = serve_fixture()
+    driver = start_chrome()
+
+    results = []
+    try:
+        elapsed, _ = bench_selenium(driver, fixture_url(server, args), args.pairs)
+        results.append(('selenium', elapsed, None))
+        for tabs in args.tabs:
+            elapsed, commands = bench_cdp(driver, fixture_url(server, args), args.pairs, tabs)
+            results.append((f"cdp ({tabs} tab{'s' if tabs > 1 else ''})", elapsed, commands))
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    baseline = results[0][1]
+    print(f"\nBackend benchmark: {args.pairs} pairs, modal delay {args.delay}ms, merge delay {args.merge_delay}ms")
+    print("-" * 70)
+    print(f"{'Backend':<16}{'Total':>10}{'Per pair':>12}{'Pairs/s':>10}{'Speedup':>10}{'CDP cmds':>12}")
+    for name, elapsed, commands in results:
+        print(f"{name:<16}{elapsed:>9.1f}s{elapsed / args.pairs * 1000:>10.0f}ms{args.pairs / elapsed:>10.2f}"
+              f"{baseline / elapsed:>9.1f}x{commands if commands is not None else '-':>12}")
+    print("-" * 70)
+
+if __name__ == "__main__":
+    main()
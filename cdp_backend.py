@@ -0,0 +1,497 @@
+"""Optional Chrome DevTools Protocol backend for process_duplicates.
+
+Talks to Chrome directly over its DevTools websocket instead of sending every
+command through chromedriver. Each step of a pair (row discovery, modal read,
+selection + merge, reject) is a single in-page script, DOM changes are awaited
+with MutationObservers instead of polling, and several tabs can be driven
+concurrently from one event loop.
+
+Requires the optional `websockets` package (pip install websockets).
+"""
+import asyncio
+import itertools
+import json
+import time
+
+import requests
+
+try:
+    import websockets
+except ImportError:  # Optional dependency, only needed for --backend cdp
+    websockets = None
+
+from automation_script import MODAL_TEARDOWN_SCRIPT, RECORD_ID_SCRIPT, PairQuarantine, choose_primary, get_single_keypress
+
+# Installed into every page: waitFor() resolves as soon as a DOM mutation makes
+# the check truthy, so waits cost one round trip instead of repeated polls
+PAGE_HELPERS = """
+window.__dedup = {
+    waitFor(check, timeout) {
+        return new Promise(resolve => {
+            const first = check();
+            if (first) return resolve(first);
+            const observer = new MutationObserver(() => {
+                const value = check();
+                if (value) { observer.disconnect(); clearTimeout(timer); resolve(value); }
+            });
+            const timer = setTimeout(() => { observer.disconnect(); resolve(null); }, timeout);
+            observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+        });
+    },
+    row(key) {
+        return document.querySelector(`tr[data-test-id="${key}"]`);
+    },
+    button(scope, dataKey) {
+        const label = scope.querySelector(`i18n-string[data-key="${dataKey}"]`);
+        return label && label.closest('button');
+    },
+    errorModal() {
+        const title = document.querySelector('h4.private-error-msg__title');
+        return title && title.textContent.trim() === 'All is not lost.' ? title : null;
+    }
+};
+"""
+
+FIND_ROWS = "() => {" + RECORD_ID_SCRIPT + """
+return Array.from(document.querySelectorAll('tr[data-test-id^="doppel-row-"]')).map(row => {
+    const links = row.querySelectorAll('td[data-test-id="doppelganger_ui-record-cell"] a[data-test-id="recordLink"]');
+    return {
+        key: row.getAttribute('data-test-id'),
+        names: Array.from(links).slice(0, 2).map(link => link.textContent.trim()),
+        ids: Array.from(links).slice(0, 2).map(recordId)
+    };
+});
+}"""
+
+OPEN_MODAL = """async ([rowKey, timeout, readContacts]) => {
+    const row = __dedup.row(rowKey);
+    if (!row) return {status: 'missing'};
+    __dedup.button(row, 'duplicates.openReviewModal').click();
+
+    const contactsXPath = "//dt[text()='Number of Associated Contacts']/following-sibling::dd[1]//span[contains(@class, 'private-truncated-string__inner')]";
+    const readCounts = () => {
+        const result = document.evaluate(contactsXPath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        if (result.snapshotLength !== 2) return null;
+        const texts = [0, 1].map(i => result.snapshotItem(i).textContent.trim());
+        return texts.every(text => text === '--' || /^\\d+$/.test(text)) ? texts : null;
+    };
+    const boxes = () => document.querySelectorAll('div.private-selectable-box.private-selectable-button');
+    const selected = () => boxes().length > 1 && boxes()[1].getAttribute('aria-checked') === 'true' ? 'right' : 'left';
+    // With both companies cached, the modal only needs to be ready to merge
+    const ready = readContacts ? readCounts : () => boxes().length === 2 ? 'ready' : null;
+    const found = await __dedup.waitFor(() => __dedup.errorModal() ? 'error' : ready(), timeout);
+    if (!found) return {status: 'timeout'};
+    if (found === 'error') return {status: 'error_modal'};
+    if (found === 'ready') return {status: 'ok', selected: selected()};
+
+    const domains = Array.from(document.querySelectorAll(
+        "div.merge-select-object div[data-test-id='domain-name'] div.private-truncated-string__inner"
+    )).map(el => el.textContent.trim());
+    return {
+        status: 'ok',
+        contacts: found.map(text => text === '--' ? 0 : parseInt(text, 10)),
+        domains: domains.length === 2 ? domains : [null, null],
+        selected: selected()
+    };
+}"""
+
+SELECT_AND_MERGE = """async ([selectRight, timeout]) => {
+    const boxes = document.querySelectorAll('div.private-selectable-box.private-selectable-button');
+    if (boxes.length !== 2) return 'no_boxes';
+    const target = boxes[selectRight ? 1 : 0];
+    if (target.getAttribute('aria-checked') !== 'true') {
+        target.click();
+        if (!await __dedup.waitFor(() => target.getAttribute('aria-checked') === 'true', 1000)) return 'not_selected';
+    }
+    const merge = await __dedup.waitFor(() => {
+        const button = document.querySelector("button[data-test-id='merge-modal-lib_merge-button']");
+        return button && !button.disabled ? button : null;
+    }, 3000);
+    if (!merge) return 'no_merge_button';
+    merge.click();
+    return await __dedup.waitFor(() => !merge.isConnected, timeout) ? 'merged' : 'timeout';
+}"""
+
+REJECT = """async ([rowKey, timeout]) => {
+    const cancel = document.querySelector("button[data-test-id='merge-modal-lib_merge-cancel-button']");
+    if (__dedup.errorModal() && cancel) {
+        cancel.click();
+        await __dedup.waitFor(() => !__dedup.errorModal(), 3000);
+    }
+    const row = __dedup.row(rowKey);
+    const reject = row && __dedup.button(row, 'duplicates.table.buttons.reject');
+    if (!reject) return false;
+    reject.click();
+    return !!await __dedup.waitFor(() => !reject.isConnected, timeout);
+}"""
+
+CLOSE_MODAL = f"() => {{{MODAL_TEARDOWN_SCRIPT}}}"
+
+class CDPError(Exception):
+    """Error returned by Chrome for a DevTools command"""
+
+class CDPConnection:
+    """One DevTools websocket, shared by every tab through flattened target sessions"""
+
+    def __init__(self, ws_url):
+        self.ws_url = ws_url
+        self.ws = None
+        self.ids = itertools.count(1)
+        self.pending = {}  # command id -> future
+        self.listeners = {}  # (session_id, method) -> [callbacks]
+        self.reader = None
+        self.commands_sent = 0
+
+    async def connect(self):
+        if websockets is None:
+            raise RuntimeError("The CDP backend needs the 'websockets' package: pip install websockets")
+        self.ws = await websockets.connect(self.ws_url, max_size=None, ping_interval=None)
+        self.reader = asyncio.ensure_future(self.read_messages())
+        return self
+
+    async def close(self):
+        if self.reader:
+            self.reader.cancel()
+        if self.ws:
+            await self.ws.close()
+
+    async def read_messages(self):
+        try:
+            async for raw in self.ws:
+                message = json.loads(raw)
+                if 'id' in message:
+                    future = self.pending.pop(message['id'], None)
+                    if future and not future.done():
+                        if 'error' in message:
+                            future.set_exception(CDPError(message['error'].get('message', message['error'])))
+                        else:
+                            future.set_result(message.get('result', {}))
+                else:
+                    for callback in self.listeners.get((message.get('sessionId'), message.get('method')), []):
+                        callback(message.get('params', {}))
+        finally:
+            # Fail anything still waiting so callers don't hang on a dead socket
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(CDPError("DevTools connection closed"))
+            self.pending.clear()
+
+    def send_nowait(self, method, params=None, session_id=None):
+        """Send a command and return a future, so independent commands can be pipelined"""
+        command_id = next(self.ids)
+        message = {'id': command_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[command_id] = future
+        self.commands_sent += 1
+
+        async def transmit():
+            try:
+                await self.ws.send(json.dumps(message))
+            except Exception as e:
+                self.pending.pop(command_id, None)
+                if not future.done():
+                    future.set_exception(CDPError(f"Failed to send {method}: {str(e)}"))
+
+        asyncio.ensure_future(transmit())
+        return future
+
+    async def send(self, method, params=None, session_id=None):
+        return await self.send_nowait(method, params, session_id)
+
+    def on(self, method, callback, session_id=None):
+        """Subscribe to a DevTools event"""
+        self.listeners.setdefault((session_id, method), []).append(callback)
+
+    def off(self, method, callback, session_id=None):
+        self.listeners.get((session_id, method), []).remove(callback)
+
+class CDPTab:
+    """A browser tab attached over the shared DevTools connection"""
+
+    def __init__(self, connection, target_id, session_id):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+
+    @classmethod
+    async def open(cls, connection, url):
+        target = await connection.send('Target.createTarget', {'url': 'about:blank'})
+        attached = await connection.send('Target.attachToTarget', {'targetId': target['targetId'], 'flatten': True})
+        tab = cls(connection, target['targetId'], attached['sessionId'])
+
+        # Independent setup commands are pipelined in one round trip
+        await asyncio.gather(
+            tab.send_nowait('Page.enable'),
+            tab.send_nowait('Runtime.enable'),
+            tab.send_nowait('Page.addScriptToEvaluateOnNewDocument', {'source': PAGE_HELPERS}),
+        )
+        await tab.navigate(url)
+        return tab
+
+    def send_nowait(self, method, params=None):
+        return self.connection.send_nowait(method, params, self.session_id)
+
+    async def send(self, method, params=None):
+        return await self.send_nowait(method, params)
+
+    async def wait_for_event(self, method, trigger, timeout=30):
+        """Run trigger() and wait for the next matching event on this tab"""
+        future = asyncio.get_running_loop().create_future()
+
+        def callback(params):
+            if not future.done():
+                future.set_result(params)
+
+        self.connection.on(method, callback, self.session_id)
+        try:
+            await trigger()
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.connection.off(method, callback, self.session_id)
+
+    async def navigate(self, url):
+        await self.wait_for_event('Page.loadEventFired', lambda: self.send('Page.navigate', {'url': url}))
+
+    async def reload(self):
+        await self.wait_for_event('Page.loadEventFired', lambda: self.send('Page.reload'))
+
+    async def evaluate(self, function, *args):
+        """Call a page function with JSON arguments in a single round trip"""
+        expression = f"({function})({json.dumps(list(args) if len(args) > 1 else (args[0] if args else None))})"
+        result = await self.send('Runtime.evaluate', {
+            'expression': expression,
+            'awaitPromise': True,
+            'returnByValue': True,
+        })
+        if 'exceptionDetails' in result:
+            raise CDPError(result['exceptionDetails'].get('text', 'Script error'))
+        return result['result'].get('value')
+
+    async def close(self):
+        await self.connection.send('Target.closeTarget', {'targetId': self.target_id})
+
+class CDPRun:
+    """Shared state for tabs working through the same duplicates list"""
+
+    def __init__(self, pairs_to_process, debug_mode=False, company_cache=None, controller=None, quarantine=None, quarantine_action='skip'):
+        self.pairs_to_process = pairs_to_process
+        self.debug_mode = debug_mode
+        self.company_cache = company_cache
+        self.controller = controller
+        self.quarantine = quarantine
+        self.quarantine_action = quarantine_action
+        self.in_flight = 0
+        self.slots = asyncio.Condition()  # Caps in-flight pairs at the controller's limit
+        # Pairs a tab has already taken, starting with those quarantine skipped in earlier batches
+        self.claimed = set(quarantine.skipped_keys) if quarantine else set()
+        self.processed_count = 0
+        self.stats = {'merged': 0, 'error_modal': 0, 'timeout': 0, 'recovery': 0, 'failed': 0, 'cancelled': 0, 'quarantined': 0}
+        self.confirm_lock = asyncio.Lock()
+        self.cancelled = False
+        self.commands_sent = 0
+
+    def claim(self, rows):
+        """Pick the first row no other tab has taken"""
+        for row in rows:
+            # Record IDs, not names: duplicates often share a name exactly
+            key = PairQuarantine.pair_key(*row['ids'], *row['names'])
+            if key not in self.claimed:
+                self.claimed.add(key)
+                return row
+        return None
+
+    def done(self):
+        return self.cancelled or self.processed_count >= self.pairs_to_process
+
+    async def acquire(self):
+        async with self.slots:
+            await self.slots.wait_for(lambda: not self.controller or self.in_flight < self.controller.in_flight_limit())
+            self.in_flight += 1
+
+    async def release(self, result, latency):
+        if self.controller:
+            if result == 'merged':
+                self.controller.record_success(latency)
+            elif result in ('timeout', 'error_modal', 'recovery'):
+                self.controller.record_backpressure(result)
+        async with self.slots:
+            self.in_flight -= 1
+            self.slots.notify_all()
+
+async def process_pair(tab, run, row):
+    """Merge one row; returns 'merged', 'error_modal' (rejected instead), 'cancelled', 'timeout' or 'failed'"""
+    debug_mode = run.debug_mode
+    company1, company2 = row['names']
+    left_id, right_id = row['ids']
+    if debug_mode:
+        print(f"\n[tab {tab.target_id[:6]}] Comparing: {company1} vs {company2}")
+
+    # Decide from the cache when both companies are fresh, skipping the contact-count wait
+    left_cached, right_cached = run.company_cache.get_pair(left_id, right_id) if run.company_cache else (None, None)
+    cached = bool(left_cached and right_cached)
+
+    modal = await tab.evaluate(OPEN_MODAL, row['key'], 5000, not cached)
+    if modal['status'] == 'error_modal':
+        if debug_mode:
+            print("⚠️ Validation error modal detected, rejecting instead...")
+        await tab.evaluate(REJECT, row['key'], 3000)
+        return 'error_modal'
+    if modal['status'] != 'ok':
+        await tab.evaluate(CLOSE_MODAL)
+        return 'timeout' if modal['status'] == 'timeout' else 'failed'
+
+    if cached:
+        left_contacts, right_contacts = left_cached['contacts'], right_cached['contacts']
+        left_domain, right_domain = left_cached['domain'], right_cached['domain']
+    else:
+        left_contacts, right_contacts = modal['contacts']
+        left_domain, right_domain = modal['domains']
+        if run.company_cache:
+            run.company_cache.put(left_id, left_contacts, left_domain)
+            run.company_cache.put(right_id, right_contacts, right_domain)
+
+    select_right = choose_primary(left_contacts, right_contacts, left_domain, right_domain, debug_mode)
+
+    if debug_mode:
+        # One prompt at a time when several tabs are running
+        async with run.confirm_lock:
+            print(f"\nSelected Company: {'RIGHT' if select_right else 'LEFT'}")
+            print(f"Contact Counts: Left ({left_contacts}) vs Right ({right_contacts})")
+            print(f"Domains: Left ({left_domain}) vs Right ({right_domain})")
+            print("\nPress Enter to merge, any other key to cancel...")
+            key = await asyncio.get_running_loop().run_in_executor(None, get_single_keypress)
+        if key != '\r':
+            print("Canceling merge...")
+            run.cancelled = True
+            await tab.evaluate(CLOSE_MODAL)
+            return 'cancelled'
+
+    status = await tab.evaluate(SELECT_AND_MERGE, select_right, 10000)
+    if status != 'merged':
+        if debug_mode:
+            print(f"❌ Merge failed: {status}")
+        await tab.evaluate(CLOSE_MODAL)
+        return 'timeout' if status == 'timeout' else 'failed'
+
+    if run.company_cache:
+        if select_right:
+            run.company_cache.record_merge(right_id, left_id)
+        else:
+            run.company_cache.record_merge(left_id, right_id)
+    if debug_mode:
+        print("✅ Merge completed successfully")
+    return 'merged'
+
+async def tab_worker(tab, run, progress_bar=None):
+    """Keep taking unclaimed rows until the run is done or the list is empty"""
+    reloaded = False
+    while not run.done():
+        rows = await tab.evaluate(FIND_ROWS)
+        row = run.claim(rows)
+        if row is None:
+            if reloaded:
+                return  # Nothing new after a reload, this tab is finished
+            await tab.reload()
+            reloaded = True
+            continue
+        reloaded = False
+
+        key = PairQuarantine.pair_key(row['ids'][0], row['ids'][1], *row['names'])
+        if run.quarantine and run.quarantine.should_skip(key):
+            if run.debug_mode:
+                print(f"⚠️ Pair is quarantined after repeated failures ({run.quarantine_action})")
+            run.quarantine.record_skip(key)
+            if run.quarantine_action == 'reject':
+                await run.acquire()
+                start = time.time()
+                try:
+                    await tab.evaluate(REJECT, row['key'], 3000)
+                finally:
+                    await run.release('quarantined', time.time() - start)
+            # Otherwise left in place; the claim keeps this tab and the others moving past it
+            run.stats['quarantined'] += 1
+            run.processed_count += 1
+            if progress_bar:
+                progress_bar.update(1)
+            continue
+
+        await run.acquire()
+        start = time.time()
+        result = 'recovery'  # Unless process_pair finishes without raising
+        try:
+            result = await process_pair(tab, run, row)
+        except Exception as e:
+            if run.debug_mode:
+                print(f"❌ Error processing pair: {str(e)}")
+            await tab.evaluate(CLOSE_MODAL)
+        finally:
+            await run.release(result, time.time() - start)
+
+        if run.quarantine:
+            if result == 'merged':
+                run.quarantine.record_success(key)
+            elif result not in ('error_modal', 'cancelled'):  # Rejected pairs won't come back; a cancel isn't the pair's fault
+                run.quarantine.record_failure(key, result, time.time() - start, record_ids=row['ids'], companies=row['names'])
+
+        run.stats[result] += 1
+        run.processed_count += 1
+        if progress_bar:
+            progress_bar.update(1)
+            if run.controller:
+                progress_bar.set_postfix(limit=f"{run.controller.limit:.1f}")
+
+async def run_pairs(ws_url, url, pairs_to_process, tabs=1, debug_mode=False, company_cache=None, progress_bar=None, controller=None, quarantine=None, quarantine_action='skip'):
+    """Process pairs across several tabs on one DevTools connection; returns the run state"""
+    connection = await CDPConnection(ws_url).connect()
+    run = CDPRun(pairs_to_process, debug_mode=debug_mode, company_cache=company_cache, controller=controller,
+                 quarantine=quarantine, quarantine_action=quarantine_action)
+    try:
+        opened = await asyncio.gather(*(CDPTab.open(connection, url) for _ in range(tabs)))
+        try:
+            await asyncio.gather(*(tab_worker(tab, run, progress_bar) for tab in opened))
+        finally:
+            await asyncio.gather(*(tab.close() for tab in opened), return_exceptions=True)
+    finally:
+        await connection.close()
+    run.commands_sent = connection.commands_sent
+    return run
+
+def get_debugger_ws_url(driver):
+    """DevTools websocket URL of the Chrome instance Selenium launched"""
+    address = driver.capabilities['goog:chromeOptions']['debuggerAddress']
+    return requests.get(f"http://{address}/json/version", timeout=5).json()['webSocketDebuggerUrl']
+
+def process_duplicates_cdp(driver, pairs_to_process, progress_bar=None, args=None, company_cache=None, controller=None, quarantine=None):
+    """CDP counterpart of process_duplicates, with the same return values"""
+    debug_mode = args and args.debug
+    tabs = getattr(args, 'tabs', 1) if args else 1
+    quarantine_action = getattr(args, 'quarantine_action', 'skip') if args else 'skip'
+    try:
+        run = asyncio.run(run_pairs(
+            get_debugger_ws_url(driver),
+            driver.current_url,
+            pairs_to_process,
+            tabs=tabs,
+            debug_mode=debug_mode,
+            company_cache=company_cache,
+            progress_bar=progress_bar,
+            controller=controller,
+            quarantine=quarantine,
+            quarantine_action=quarantine_action
+        ))
+    except Exception as e:
+        print(f"❌ CDP backend error: {str(e)}")
+        return False
+
+    if debug_mode:
+        print(f"\nCDP run: {run.stats['merged']} merged, {run.stats['error_modal']} rejected after error modal, "
+              f"{run.stats['timeout'] + run.stats['recovery'] + run.stats['failed']} failed, "
+              f"{run.stats['cancelled']} cancelled, {run.stats['quarantined']} quarantined, {run.commands_sent} DevTools commands")
+    if run.cancelled:
+        return False
+    if run.processed_count < pairs_to_process:
+        print("\nProcessing complete!")
+        return None  # No more rows to process
+    return True
@@ -0,0 +1,362 @@
+import argparse
+import csv
+import hashlib
+import random
+import re
+import string
+import struct
+import sys
+import time
+import unicodedata
+import zlib
+from collections import defaultdict
+from functools import partial
+from multiprocessing import Pool, cpu_count
+
+# Column names in a HubSpot company export (first match wins)
+ID_COLUMNS = ['Record ID', 'Company ID', 'id']
+NAME_COLUMNS = ['Company name', 'Name', 'name']
+DOMAIN_COLUMNS = ['Company Domain Name', 'Website URL', 'domain']
+CONTACTS_COLUMNS = ['Number of Associated Contacts', 'num_associated_contacts']
+
+# Trailing words that don't distinguish one company from another
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company',
+    'gmbh', 'ag', 'sa', 'sas', 'srl', 'bv', 'nv', 'plc', 'pty', 'lp', 'llp', 'oy', 'ab', 'as'
+}
+
+# Two-label public suffixes, so acme.co.uk keeps "acme" as its registrable label
+MULTI_PART_SUFFIXES = {
+    'co.uk', 'org.uk', 'ac.uk', 'com.au', 'net.au', 'org.au', 'co.nz', 'co.jp',
+    'com.br', 'co.in', 'co.za', 'com.mx', 'com.sg', 'com.cn'
+}
+
+# MinHash/LSH settings: 16 permutations in 4 bands of 4 rows. A pair with shingle
+# Jaccard similarity s becomes a candidate with probability 1 - (1 - s^4)^4, an
+# S-curve centred near 0.71: ~23% at 0.5, ~67% at 0.7, ~95% at 0.85
+# One 64-byte blake2b digest per shingle supplies all 16 32-bit hash functions
+NUM_PERM = 16
+BANDS = 4
+ROWS = NUM_PERM // BANDS
+SIGNATURE_FORMAT = struct.Struct(f'<{NUM_PERM}I')
+
+# A one-letter typo leaves a short name at Jaccard ~0.6, which the bands above
+# only catch ~43% of the time. Every token this long also gets a key per
+# one-character deletion, so tokens one edit apart always share a bucket
+TYPO_MIN_LENGTH = 5
+
+# Shingle overlap below which a pair with no domain in common isn't worth an edit distance
+NAME_PREFILTER = 0.5
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Find duplicate companies in a HubSpot export')
+    parser.add_argument('export', nargs='?', help='Company export CSV')
+    parser.add_argument('--output', default='candidate_pairs.csv', help='Where to write scored pairs')
+    parser.add_argument('--threshold', type=float, default=0.7, help='Minimum score for a pair sharing a domain to be written')
+    parser.add_argument('--name-threshold', type=float, default=0.88, help='Minimum name edit similarity for a pair with no domain in common')
+    parser.add_argument('--max-bucket', type=int, default=50, help='Skip blocking buckets larger than this (very common names/domains)')
+    parser.add_argument('--workers', type=int, default=cpu_count(), help='Worker processes')
+    parser.add_argument('--benchmark', type=int, metavar='N', help='Run on N synthetic companies instead of an export (e.g. 1000000)')
+    return parser.parse_args()
+
+def normalize_name(name):
+    """Lowercase, strip accents/punctuation and trailing legal suffixes"""
+    name = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode()
+    name = name.lower().replace('&', ' and ')
+    tokens = re.sub(r'[^a-z0-9]+', ' ', name).split()
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return ' '.join(tokens)
+
+def registrable_domain(domain):
+    """Reduce a domain or URL to its registrable part, e.g. https://www.acme.co.uk/x -> acme.co.uk"""
+    domain = (domain or '').strip().lower()
+    if domain in ('', '--'):
+        return ''
+    domain = re.sub(r'^[a-z]+://', '', domain).split('/')[0].split(':')[0]
+    labels = [label for label in domain.split('.') if label]
+    if len(labels) < 2:
+        return ''
+    if '.'.join(labels[-2:]) in MULTI_PART_SUFFIXES and len(labels) >= 3:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+def domain_stem(registrable):
+    """Registrable domain without its suffix, so acme.io and acme.com compare equal"""
+    return registrable.split('.', 1)[0] if registrable else ''
+
+def shingles(name):
+    """Character 3-grams of a normalized name"""
+    padded = f" {name} "
+    if len(padded) <= 3:
+        return {padded}
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def minhash_bands(name):
+    """LSH band keys for a normalized name"""
+    hashed = [SIGNATURE_FORMAT.unpack(hashlib.blake2b(s.encode(), digest_size=64).digest()) for s in shingles(name)]
+    signature = [min(column) for column in zip(*hashed)]
+    return [hash((band,) + tuple(signature[band * ROWS:(band + 1) * ROWS])) for band in range(BANDS)]
+
+def typo_keys(name):
+    """Blocking keys for every single-character deletion of each long token"""
+    keys = set()  # Doubled letters give the same deletion twice
+    for token in name.split():
+        if len(token) >= TYPO_MIN_LENGTH:
+            keys.update(zlib.crc32(f"t:{token[:i]}{token[i + 1:]}".encode()) for i in range(len(token)))
+    return keys
+
+def edit_similarity(a, b):
+    """1 - Levenshtein distance / longer length"""
+    if a == b:
+        return 1.0
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return 1 - previous[-1] / max(len(a), len(b))
+
+def featurize(company):
+    """Normalize one (record_id, name, domain, contacts) row and compute its blocking keys"""
+    record_id, name, domain, contacts = company
+    norm_name = normalize_name(name)
+    registrable = registrable_domain(domain)
+    stem = domain_stem(registrable)
+
+    keys = []
+    if stem:
+        keys.append(zlib.crc32(f"d:{stem}".encode()))
+    if norm_name:
+        keys.append(zlib.crc32(f"n:{norm_name}".encode()))
+        keys.extend(minhash_bands(norm_name))
+        keys.extend(typo_keys(norm_name))
+    return (record_id, name, norm_name, registrable, stem, contacts), keys
+
+def featurize_chunk(chunk):
+    return [featurize(company) for company in chunk]
+
+def score_pair(left, right):
+    """Score how likely two featurized companies are duplicates (0-1)"""
+    name_sim = 0.0
+    if left[2] and right[2]:
+        a, b = shingles(left[2]), shingles(right[2])
+        name_sim = len(a & b) / len(a | b)
+
+    if left[3] and left[3] == right[3]:
+        return 0.7 + 0.3 * name_sim  # Same registrable domain
+    if left[4] and left[4] == right[4]:
+        return 0.5 + 0.5 * name_sim  # Same domain label, different suffix (acme.io vs acme.com)
+    if name_sim < NAME_PREFILTER:
+        return name_sim
+    # Name alone: shared generic words inflate shingle overlap, so score by edit distance
+    return edit_similarity(left[2], right[2])
+
+def keep_pair(left, right, score, threshold=0.7, name_threshold=0.88):
+    """Pairs with a domain label in common must reach threshold, name-only pairs name_threshold"""
+    if left[4] and left[4] == right[4]:
+        return score >= threshold
+    return score >= name_threshold
+
+def score_chunk(chunk, threshold=0.7, name_threshold=0.88):
+    scored = ((left, right, score_pair(left, right)) for left, right in chunk)
+    return [(left[0], right[0], score) for left, right, score in scored
+            if keep_pair(left, right, score, threshold, name_threshold)]
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def first_column(row, names):
+    for name in names:
+        if name in row:
+            return row[name]
+    return ''
+
+def read_export(path):
+    """Stream (record_id, name, domain, contacts) rows from a company export"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            contacts = first_column(row, CONTACTS_COLUMNS).strip()
+            yield (
+                first_column(row, ID_COLUMNS),
+                first_column(row, NAME_COLUMNS),
+                first_column(row, DOMAIN_COLUMNS),
+                int(contacts) if contacts.isdigit() else 0
+            )
+
+def find_duplicates(companies, workers=None, max_bucket=50, threshold=0.7, name_threshold=0.88, chunk_size=10000, track_pairs=None):
+    """Return (scored pairs, features, stats) for an iterable of (record_id, name, domain, contacts) rows
+
+    track_pairs is an optional set of (record_id, record_id) pairs; the ones that
+    made it into the candidate set are returned in stats['tracked_candidates'].
+    """
+    stats = {}
+    features = []
+    buckets = defaultdict(list)
+
+    with Pool(processes=workers or cpu_count()) as pool:
+        # Step 1: Normalize and compute blocking/LSH keys in parallel
+        start = time.time()
+        for results in pool.imap(featurize_chunk, chunked(companies, chunk_size)):
+            for feature, keys in results:
+                index = len(features)
+                features.append(feature)
+                for key in keys:
+                    buckets[key].append(index)
+        stats['companies'] = len(features)
+        stats['featurize_seconds'] = time.time() - start
+
+        # Step 2: Candidate pairs come only from shared buckets, never all-vs-all
+        start = time.time()
+        candidates = set()
+        skipped_buckets = 0
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if len(members) > max_bucket:
+                skipped_buckets += 1
+                continue
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    candidates.add((members[i], members[j]))
+        buckets.clear()
+        if track_pairs:
+            index_of = {feature[0]: index for index, feature in enumerate(features)}
+            stats['tracked_candidates'] = {
+                pair for pair in track_pairs
+                if tuple(sorted((index_of[pair[0]], index_of[pair[1]]))) in candidates
+            }
+        stats['candidates'] = len(candidates)
+        stats['skipped_buckets'] = skipped_buckets
+        stats['candidate_seconds'] = time.time() - start
+
+        # Step 3: Score candidates in parallel
+        start = time.time()
+        pairs = []
+        pair_features = ((features[i], features[j]) for i, j in candidates)
+        scorer = partial(score_chunk, threshold=threshold, name_threshold=name_threshold)
+        for results in pool.imap_unordered(scorer, chunked(pair_features, chunk_size)):
+            pairs.extend(results)
+        stats['score_seconds'] = time.time() - start
+
+    pairs.sort(key=lambda pair: pair[2], reverse=True)
+    stats['pairs'] = len(pairs)
+    return pairs, features, stats
+
+def write_pairs(path, pairs, features):
+    """Write scored pairs with the fields the merge rules look at"""
+    by_id = {feature[0]: feature for feature in features}
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['left_id', 'right_id', 'score', 'left_name', 'right_name',
+                         'left_domain', 'right_domain', 'left_contacts', 'right_contacts'])
+        for left_id, right_id, score in pairs:
+            left, right = by_id[left_id], by_id[right_id]
+            writer.writerow([left_id, right_id, f"{score:.3f}", left[1], right[1],
+                             left[3], right[3], left[5], right[5]])
+
+def typo(text, rng):
+    """Replace one character with a different letter"""
+    pos = rng.randrange(1, len(text))
+    letter = rng.choice([c for c in string.ascii_lowercase if c != text[pos].lower()])
+    return text[:pos] + letter + text[pos + 1:]
+
+def synthetic_companies(n, duplicate_rate=0.1, name_only_share=0.3, seed=7):
+    """Generate n fake companies with planted near-duplicates
+
+    Returns (rows, planted) where planted maps 'domain' to duplicates sharing a
+    domain label (acme.io vs acme.com) and 'name' to duplicates whose names
+    differ by a typo and whose domains are unrelated or missing, so only
+    the name keys (MinHash/LSH and typo keys) can pair them.
+    """
+    rng = random.Random(seed)
+    syllables = [c + v for c in 'bcdfghjklmnprstvwxz' for v in 'aeiou']
+    words = ['labs', 'systems', 'group', 'partners', 'digital', 'health', 'capital', 'software']
+    tlds = ['.com', '.io', '.ai', '.net', '.org', '.co', '.tech', '.biz']
+    suffixes = ['', ' Inc', ' LLC', ', Inc.', ' Ltd']
+
+    def random_base():
+        return ''.join(rng.choice(syllables) for _ in range(rng.randint(3, 4)))
+
+    rows = []
+    planted = {'domain': set(), 'name': set()}
+    while len(rows) < n:
+        base = random_base()
+        name = f"{base.capitalize()} {rng.choice(words).capitalize()}"
+        record_id = str(len(rows) + 1)
+        rows.append((record_id, name + rng.choice(suffixes), base + rng.choice(tlds), rng.randint(0, 40)))
+
+        if rng.random() < duplicate_rate and len(rows) < n:
+            dup_id = str(len(rows) + 1)
+            if rng.random() < name_only_share:
+                # Typo'd name with an unrelated or missing domain
+                domain = '' if rng.random() < 0.5 else random_base() + rng.choice(tlds)
+                rows.append((dup_id, typo(name, rng) + rng.choice(suffixes), domain, rng.randint(0, 40)))
+                planted['name'].add((record_id, dup_id))
+            else:
+                # Domain variant, legal suffix and/or a one-character typo
+                variant = typo(name, rng) if rng.random() < 0.5 else name
+                rows.append((dup_id, variant + rng.choice(suffixes), base + rng.choice(tlds), rng.randint(0, 40)))
+                planted['domain'].add((record_id, dup_id))
+    return rows, planted
+
+def run_benchmark(n, args):
+    print(f"Generating {n:,} synthetic companies...")
+    rows, planted = synthetic_companies(n)
+
+    start = time.time()
+    pairs, _, stats = find_duplicates(rows, workers=args.workers, max_bucket=args.max_bucket,
+                                      threshold=args.threshold, name_threshold=args.name_threshold,
+                                      track_pairs=planted['name'])
+    elapsed = time.time() - start
+
+    found = {tuple(sorted((left, right), key=int)) for left, right, _ in pairs}
+
+    def recall(kind):
+        hits = len(found & planted[kind])
+        return f"{hits / len(planted[kind]):.1%} ({hits:,}/{len(planted[kind]):,})" if planted[kind] else "n/a"
+
+    name_candidates = len(stats['tracked_candidates'])
+    name_candidate_recall = f"{name_candidates / len(planted['name']):.1%} ({name_candidates:,}/{len(planted['name']):,})" if planted['name'] else "n/a"
+
+    print("\nBenchmark Results:")
+    print("-" * 60)
+    print(f"Companies:                 {stats['companies']:,}")
+    print(f"Workers:                   {args.workers}")
+    print(f"Featurize:                 {stats['featurize_seconds']:.1f}s")
+    print(f"Candidate pairs:           {stats['candidates']:,} ({stats['candidate_seconds']:.1f}s, {stats['skipped_buckets']:,} oversized buckets skipped)")
+    print(f"Scoring:                   {stats['score_seconds']:.1f}s")
+    print(f"Pairs kept:                {stats['pairs']:,} (>= {args.threshold} sharing a domain, >= {args.name_threshold} name-only)")
+    print(f"Recall, domain variants:   {recall('domain')}")
+    print(f"Name-only candidates:      {name_candidate_recall}")
+    print(f"Recall, name-only:         {recall('name')}")
+    print(f"Total:                     {elapsed:.1f}s ({stats['companies'] / elapsed:,.0f} companies/s)")
+    print("-" * 60)
+
+def main():
+    args = parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark, args)
+        return
+
+    if not args.export:
+        print("Please provide a company export CSV (or --benchmark N)")
+        sys.exit(1)
+
+    print(f"Scanning {args.export}...")
+    pairs, features, stats = find_duplicates(read_export(args.export), workers=args.workers, max_bucket=args.max_bucket,
+                                             threshold=args.threshold, name_threshold=args.name_threshold)
+    write_pairs(args.output, pairs, features)
+    print(f"✅ {stats['pairs']:,} candidate pairs from {stats['companies']:,} companies written to {args.output}")
+
+if __name__ == "__main__":
+    main()
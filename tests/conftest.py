@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The scripts live at the repo root rather than in a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
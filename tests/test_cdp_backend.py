@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import pytest
+
+websockets = pytest.importorskip('websockets')
+
+import cdp_backend
+from automation_script import CompanyCache, PairQuarantine
+
+class StubDevTools:
+    """Minimal DevTools endpoint: targets, flattened sessions, page loads and canned page scripts
+
+    Rows all carry the same company names (as real duplicates often do) but
+    distinct record IDs. A merge removes the row whose modal that session opened.
+    """
+
+    def __init__(self, pairs):
+        self.rows = [
+            {'key': f"doppel-row-{i}", 'names': ['Acme Inc', 'Acme Inc'], 'ids': [str(100 + 2 * i), str(101 + 2 * i)]}
+            for i in range(pairs)
+        ]
+        self.merged = []
+        self.sessions = set()
+        self.modal_reads = []  # readContacts flag of every OPEN_MODAL call
+        self.selections = []  # selectRight flag of every merge
+        self.rejected = []
+        self.open_rows = {}  # session -> row key of its open modal
+
+    async def handler(self, ws):
+        async for raw in ws:
+            message = json.loads(raw)
+            method, session_id = message['method'], message.get('sessionId')
+            result = {}
+            if method == 'Target.createTarget':
+                result = {'targetId': f"target-{message['id']}"}
+            elif method == 'Target.attachToTarget':
+                result = {'sessionId': f"session-{message['params']['targetId']}"}
+                self.sessions.add(result['sessionId'])
+            elif method in ('Page.navigate', 'Page.reload'):
+                await ws.send(json.dumps({'id': message['id'], 'result': {}}))
+                await ws.send(json.dumps({'method': 'Page.loadEventFired', 'sessionId': session_id, 'params': {}}))
+                continue
+            elif method == 'Runtime.evaluate':
+                result = {'result': {'value': self.evaluate(session_id, message['params']['expression'])}}
+            elif method == 'Runtime.fail':
+                await ws.send(json.dumps({'id': message['id'], 'error': {'message': 'no such method'}}))
+                continue
+            await ws.send(json.dumps({'id': message['id'], 'result': result}))
+
+    def evaluate(self, session_id, expression):
+        if expression.startswith(f"({cdp_backend.FIND_ROWS})"):
+            return self.rows
+        if expression.startswith(f"({cdp_backend.OPEN_MODAL})"):
+            row_key, _, read_contacts = json.loads(expression[len(f"({cdp_backend.OPEN_MODAL})("):-1])
+            self.open_rows[session_id] = row_key
+            self.modal_reads.append(read_contacts)
+            if not read_contacts:
+                return {'status': 'ok', 'selected': 'left'}
+            return {'status': 'ok', 'contacts': [1, 3], 'domains': ['acme.com', 'acme.io'], 'selected': 'left'}
+        if expression.startswith(f"({cdp_backend.REJECT})"):
+            row_key, _ = json.loads(expression[len(f"({cdp_backend.REJECT})("):-1])
+            self.rejected.append(row_key)
+            self.rows = [row for row in self.rows if row['key'] != row_key]
+            return True
+        if expression.startswith(f"({cdp_backend.SELECT_AND_MERGE})"):
+            select_right, _ = json.loads(expression[len(f"({cdp_backend.SELECT_AND_MERGE})("):-1])
+            self.selections.append(select_right)
+            row_key = self.open_rows.pop(session_id)
+            row = next(row for row in self.rows if row['key'] == row_key)
+            self.rows.remove(row)
+            self.merged.append(row['ids'])
+            return 'merged'
+        return True
+
+async def run_against_stub(pairs, **kwargs):
+    stub = StubDevTools(pairs)
+    async with websockets.serve(stub.handler, '127.0.0.1', 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        run = await cdp_backend.run_pairs(f"ws://127.0.0.1:{port}", 'http://fixture/', pairs + 5, **kwargs)
+    return stub, run
+
+def test_tabs_process_every_pair_with_identical_names():
+    cache = CompanyCache()
+    stub, run = asyncio.run(run_against_stub(5, tabs=2, company_cache=cache))
+
+    assert len(stub.sessions) == 2
+    assert run.stats['merged'] == 5
+    assert len(stub.merged) == 5
+    assert len(cache.entries) == 0  # Merges drop both companies from the cache
+
+def test_cached_pairs_skip_contact_counts():
+    cache = CompanyCache()
+    # First pair prefetched; the left company has more contacts, unlike the modal's counts
+    cache.put('100', 9, 'acme.com')
+    cache.put('101', 2, 'acme.io')
+    stub, run = asyncio.run(run_against_stub(2, company_cache=cache))
+
+    assert run.stats['merged'] == 2
+    assert stub.modal_reads == [False, True]
+    assert stub.selections == [False, True]  # Cached counts picked the left company, scraped ones the right
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_command_errors_raise():
+    async def scenario():
+        stub = StubDevTools(0)
+        async with websockets.serve(stub.handler, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            connection = await cdp_backend.CDPConnection(f"ws://127.0.0.1:{port}").connect()
+            try:
+                with pytest.raises(cdp_backend.CDPError):
+                    await connection.send('Runtime.fail')
+                # Pipelined commands resolve independently
+                first, second = await asyncio.gather(
+                    connection.send('Target.createTarget', {'url': 'about:blank'}),
+                    connection.send('Target.createTarget', {'url': 'about:blank'}),
+                )
+                assert first['targetId'] != second['targetId']
+            finally:
+                await connection.close()
+
+    asyncio.run(scenario())
+
+@pytest.mark.parametrize('action, rejected', [('skip', []), ('reject', ['doppel-row-0'])])
+def test_quarantined_pairs_follow_quarantine_action(tmp_path, action, rejected):
+    quarantine = PairQuarantine(tmp_path / 'quarantine.json', threshold=2)
+    for _ in range(2):
+        quarantine.record_failure('100:101', 'timeout', 1.0)
+    stub, run = asyncio.run(run_against_stub(3, quarantine=quarantine, quarantine_action=action))
+
+    assert stub.rejected == rejected
+    assert run.stats['quarantined'] == 1
+    assert run.stats['merged'] == 2
+    assert ['100', '101'] not in stub.merged
@@ -0,0 +1,46 @@
+import pytest
+
+from automation_script import CompanyCache, choose_primary
+
+def test_ttl_expiry():
+    cache = CompanyCache(ttl=60)
+    cache.put('101', 5, 'acme.com')
+    assert cache.get('101')['contacts'] == 5
+
+    cache.entries['101']['last_seen'] -= 61
+    assert cache.get('101') is None
+    assert '101' not in cache.entries
+
+def test_lru_eviction_at_max_size():
+    cache = CompanyCache(max_size=2)
+    cache.put('101', 1, '--')
+    cache.put('102', 2, '--')
+    cache.get('101')  # 102 is now least recently used
+    cache.put('103', 3, '--')
+    assert list(cache.entries) == ['101', '103']
+
+def test_get_pair_counts_once_per_pair():
+    cache = CompanyCache()
+    cache.put('101', 1, 'acme.com')
+    cache.put('102', 2, 'acme.io')
+
+    assert cache.get_pair('101', '102') == (cache.entries['101'], cache.entries['102'])
+    assert cache.get_pair('101', '999') == (None, None)
+    assert cache.get_pair(None, None) == (None, None)
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.hit_rate() == pytest.approx(1 / 3)
+
+def test_record_merge_drops_both_records():
+    cache = CompanyCache()
+    cache.put('101', 4, 'acme.com')
+    cache.put('102', 3, 'acme.io')
+    cache.record_merge('101', '102')
+    assert cache.entries == {}
+
+    cache.record_merge('101', '102')  # Already gone
+
+def test_missing_domain_is_not_decided():
+    # The pair goes down the error path rather than merging into the left company
+    with pytest.raises(AttributeError):
+        choose_primary(0, 0, None, 'acme.com')
+    assert choose_primary(0, 0, 'acme.io', 'acme.com') is True
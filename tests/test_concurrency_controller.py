@@ -0,0 +1,26 @@
+from automation_script import ConcurrencyController
+
+def test_starts_at_ceiling_without_pacing():
+    controller = ConcurrencyController(ceiling=4)
+    assert controller.in_flight_limit() == 4
+    assert controller.pacing_delay() == 0
+
+def test_baseline_follows_lasting_latency_change():
+    controller = ConcurrencyController(ceiling=4)
+    controller.record_success(0.5)
+    for _ in range(30):
+        controller.record_success(1.5)
+
+    # A couple of slow flags while the baseline catches up, then it settles
+    assert controller.backpressure.get('slow', 0) <= 3
+    assert controller.in_flight_limit() == 4
+    assert controller.pacing_delay() == 0
+
+def test_backpressure_halves_and_recovers():
+    controller = ConcurrencyController(ceiling=4)
+    controller.record_backpressure('timeout')
+    assert controller.in_flight_limit() == 2
+    assert controller.pacing_delay() > 0
+    for _ in range(20):
+        controller.record_success(1.0)
+    assert controller.in_flight_limit() == 4
@@ -0,0 +1,35 @@
+import pytest
+
+import automation_script
+from automation_script import get_contact_counts
+
+class FakeElement:
+    def __init__(self, text=''):
+        self.text = text
+
+class FakeDriver:
+    """Modal already open, showing the given contact count texts"""
+
+    def __init__(self, texts):
+        self.texts = texts
+
+    def find_element(self, by, value):
+        return FakeElement()
+
+    def find_elements(self, by, value):
+        return [FakeElement(text) for text in self.texts]
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(automation_script.time, 'sleep', lambda seconds: None)
+
+def test_counts_are_parsed():
+    assert get_contact_counts(FakeDriver(['12', '--'])) == (12, 0)
+
+def test_failure_raises_its_real_cause():
+    with pytest.raises(ValueError, match='Invalid values'):
+        get_contact_counts(FakeDriver(['12', 'n/a']))
+
+def test_handled_error_modal_returns_none(monkeypatch):
+    monkeypatch.setattr(automation_script, 'check_for_error_modal', lambda driver, row, debug_mode: True)
+    assert get_contact_counts(FakeDriver(['', '']), current_row=object(), debug_mode=True) == (None, None)
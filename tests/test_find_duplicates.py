@@ -0,0 +1,46 @@
+import pytest
+
+from find_duplicates import edit_similarity, featurize, find_duplicates, normalize_name, registrable_domain, score_pair
+
+def test_normalize_name():
+    assert normalize_name('Acme, Inc.') == 'acme'
+    assert normalize_name('Acme Holdings Co LLC') == 'acme holdings'
+    assert normalize_name('Société Générale') == 'societe generale'
+    assert normalize_name('Smith & Sons') == 'smith and sons'
+    assert normalize_name('Inc') == 'inc'  # Never strips the whole name
+
+def test_registrable_domain():
+    assert registrable_domain('acme.co.uk') == 'acme.co.uk'
+    assert registrable_domain('https://www.acme.co.uk/about') == 'acme.co.uk'
+    assert registrable_domain('http://shop.acme.com:8080/x') == 'acme.com'
+    assert registrable_domain('--') == ''
+    assert registrable_domain('localhost') == ''
+
+def features(name, domain):
+    return featurize(('1', name, domain, 0))[0]
+
+def test_score_pair():
+    same_domain = score_pair(features('Acme Labs', 'acme.com'), features('Acme Labs Inc', 'www.acme.com'))
+    domain_variant = score_pair(features('Acme Labs', 'acme.io'), features('Acme Labs', 'acme.com'))
+    typo = score_pair(features('Zegaju Group', ''), features('Zegaju Groop', 'other.io'))
+    unrelated = score_pair(features('Zegaju Group', ''), features('Noxazu Group', ''))
+
+    assert same_domain == pytest.approx(1.0)
+    assert domain_variant == pytest.approx(1.0)
+    assert typo == pytest.approx(edit_similarity('zegaju group', 'zegaju groop'))
+    assert typo > 0.9 > unrelated
+
+def test_find_duplicates_returns_domain_variant_and_typo():
+    companies = [
+        ('1', 'Acme', 'acme.io', 3),
+        ('2', 'Acme Inc', 'https://acme.com', 5),
+        ('3', 'Brightwater Analytics', 'brightwater.com', 1),
+        ('4', 'Brightwatter Analytics LLC', '', 0),
+        ('5', 'Zegaju Group', 'zegaju.net', 2),
+        ('6', 'Noxazu Group', 'noxazu.org', 2),
+    ]
+    pairs, _, stats = find_duplicates(companies, workers=1)
+
+    found = {frozenset(pair[:2]) for pair in pairs}
+    assert found == {frozenset({'1', '2'}), frozenset({'3', '4'})}
+    assert stats['companies'] == 6
@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from automation_script import DUPLICATES_API_PATH, CompanyCache, HubSpotSession
+
+class StubHubSpot:
+    """Local HTTP stub that only answers requests carrying the current session cookie"""
+
+    def __init__(self):
+        self.token = 'token-1'
+        self.rejected = 0
+        self.redirect_to = None  # Set to answer every request with a redirect
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if stub.redirect_to:
+                    self.send_response(302)
+                    self.send_header('Location', stub.redirect_to)
+                    self.end_headers()
+                    return
+                if f"hubspotapi={stub.token}" not in (self.headers.get('Cookie') or ''):
+                    stub.rejected += 1
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+                path = self.path.split('?')[0]
+                if path == DUPLICATES_API_PATH:
+                    body = {'results': [{'objectIds': [1, 2]}, {'objectIds': [3, 4]}], 'hasMore': False}
+                else:
+                    record_id = path.rsplit('/', 1)[-1]
+                    body = {'properties': {
+                        'num_associated_contacts': {'value': record_id},
+                        'domain': {'value': f"company{record_id}.com"}
+                    }}
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+class FakeDriver:
+    """Stands in for the Selenium driver: hands out whatever cookie the browser holds now"""
+
+    def __init__(self, token, expiry=None):
+        self.token = token
+        self.expiry = expiry
+        self.cookie_reads = 0
+
+    def get_cookies(self):
+        self.cookie_reads += 1
+        cookie = {'name': 'hubspotapi', 'value': self.token, 'path': '/'}
+        if self.expiry:
+            cookie['expiry'] = self.expiry
+        return [cookie]
+
+@pytest.fixture
+def stub():
+    stub = StubHubSpot()
+    yield stub
+    stub.server.shutdown()
+
+def test_prefetch_fills_cache(stub):
+    session = HubSpotSession(FakeDriver(stub.token), base_url=stub.url, max_workers=2)
+    cache = CompanyCache()
+
+    assert session.prefetch_into_cache(cache) == 4
+    assert cache.get('3')['contacts'] == 3
+    assert cache.get('4')['domain'] == 'company4.com'
+    assert stub.rejected == 0
+
+def test_rejected_cookie_is_refreshed_from_browser(stub):
+    driver = FakeDriver(stub.token)
+    session = HubSpotSession(driver, base_url=stub.url, max_workers=1)
+
+    # The browser renewed its session; the HTTP session still holds the old cookie
+    stub.token = driver.token = 'token-2'
+    assert session.prefetch_into_cache(CompanyCache()) == 4
+    assert stub.rejected >= 1
+    assert driver.cookie_reads >= 2
+
+def test_expired_cookie_is_refreshed_before_request(stub):
+    driver = FakeDriver(stub.token, expiry=time.time() - 1)
+    session = HubSpotSession(driver, base_url=stub.url, max_workers=1)
+
+    stub.token = driver.token = 'token-2'
+    assert session.prefetch_into_cache(CompanyCache()) == 4
+    assert stub.rejected == 0  # Refreshed up front, never sent the stale cookie
+
+def test_cookies_are_scoped_to_api_host(stub):
+    session = HubSpotSession(FakeDriver(stub.token), base_url=stub.url)
+
+    def cookie_header(url):
+        return session.session.prepare_request(requests.Request('GET', url)).headers.get('Cookie') or ''
+
+    assert 'hubspotapi' in cookie_header(f"{stub.url}{DUPLICATES_API_PATH}")
+    assert 'hubspotapi' not in cookie_header('https://evil.example.com/')
+
+def test_redirects_are_not_followed(stub):
+    session = HubSpotSession(FakeDriver(stub.token), base_url=stub.url)
+    stub.redirect_to = 'https://evil.example.com/collect'
+
+    with pytest.raises(requests.HTTPError):
+        session.get_json(DUPLICATES_API_PATH)
+
+def test_concurrent_rejections_refresh_once(stub):
+    driver = FakeDriver(stub.token)
+    session = HubSpotSession(driver, base_url=stub.url, max_workers=8)
+
+    stub.token = driver.token = 'token-2'
+    record_ids = [str(record_id) for record_id in range(1, 41)]
+    companies = session.fetch_companies(record_ids)
+
+    assert sorted(companies) == sorted(record_ids)  # Nothing dropped while the jar was refreshed
+    assert driver.cookie_reads == 2  # Once at start, once for the whole burst of 401s
@@ -0,0 +1,29 @@
+from automation_script import PairQuarantine
+
+def quarantined(tmp_path):
+    quarantine = PairQuarantine(tmp_path / 'quarantine.json', threshold=2)
+    key = PairQuarantine.pair_key('101', '102', 'Acme', 'Acme')
+    for _ in range(2):
+        quarantine.record_failure(key, 'TimeoutException', 4.0, record_ids=['101', '102'], companies=['Acme', 'Acme'])
+    return quarantine, key
+
+def test_quarantine_persists_and_skips(tmp_path):
+    _, key = quarantined(tmp_path)
+    reloaded = PairQuarantine(tmp_path / 'quarantine.json', threshold=2)
+    assert reloaded.should_skip(key)
+    assert reloaded.quarantined_count() == 1
+
+def test_skip_counted_once_per_run(tmp_path):
+    quarantine, key = quarantined(tmp_path)
+    # The pair stays in the list, so every batch of the run meets it again
+    for _ in range(3):
+        quarantine.record_skip(key)
+    assert quarantine.skipped == 1
+    assert quarantine.time_saved == 4.0
+    assert quarantine.skipped_keys == {key}
+
+def test_success_releases_pair(tmp_path):
+    quarantine, key = quarantined(tmp_path)
+    quarantine.record_success(key)
+    assert not quarantine.should_skip(key)
+    assert quarantine.quarantined_count() == 0
@@ -0,0 +1,38 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from automation_script import RECORD_ID_SCRIPT, get_record_ids
+
+HREFS = [
+    'https://app.hubspot.com/contacts/22104039/record/0-2/123',
+    'https://app.hubspot.com/contacts/22104039/record/0-2/123/',
+    'https://app.hubspot.com/contacts/22104039/record/0-2/123?tab=merge',
+    'https://app.hubspot.com/contacts/22104039/record/0-2/abc123',
+    'https://app.hubspot.com/contacts/22104039/record/0-2/',
+    '',
+]
+
+class FakeLink:
+    def __init__(self, href):
+        self.href = href
+
+    def get_attribute(self, name):
+        return self.href
+
+class FakeRow:
+    def __init__(self, hrefs):
+        self.links = [FakeLink(href) for href in hrefs]
+
+    def find_elements(self, *args):
+        return self.links
+
+@pytest.mark.skipif(not shutil.which('node'), reason='node not installed')
+def test_page_scripts_parse_record_ids_like_python():
+    script = RECORD_ID_SCRIPT + f"console.log(JSON.stringify({json.dumps(HREFS)}.map(href => recordId({{href}}))));"
+    js_ids = json.loads(subprocess.run(['node', '-e', script], capture_output=True, text=True, check=True).stdout)
+
+    python_ids = [get_record_ids(FakeRow([href, href]))[0] for href in HREFS]
+    assert js_ids == python_ids == ['123', '123', '123', None, None, None]